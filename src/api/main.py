@@ -9,7 +9,7 @@ from azure.ai.projects.aio import AIProjectClient
 from azure.identity import DefaultAzureCredential
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 from logging_config import configure_logging
@@ -87,8 +87,12 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
         if not agent:
             raise RuntimeError("No agent found. Ensure qunicorn.conf.py created one or set AZURE_AI_AGENT_ID.")
 
+        from .routes import AdmissionController, FileNameCache
+
         app.state.ai_client = ai_client
         app.state.agent = agent
+        app.state.file_names = FileNameCache(ai_client)
+        app.state.admission = AdmissionController(int(os.getenv("MAX_CONCURRENT_STREAMS", "64")))
 
         yield
 
@@ -112,14 +116,14 @@ def create_app() -> FastAPI:
     :rtype: FastAPI
     """
     directory = os.path.join(os.path.dirname(__file__), "static")
-    app = FastAPI(lifespan=lifespan)
+    app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
     app.mount("/static", StaticFiles(directory=directory), name="static")
 
     from . import routes  # Import routes from this package
     app.include_router(routes.router)
 
     @app.exception_handler(Exception)
-    async def global_exception_handler(request: Request, exc: Exception) -> JSONResponse:
+    async def global_exception_handler(request: Request, exc: Exception) -> ORJSONResponse:
         """
         Global exception handler returning a 500 for unhandled errors.
 
@@ -127,11 +131,11 @@ def create_app() -> FastAPI:
         :type request: Request
         :param exc: The unhandled exception.
         :type exc: Exception
-        :return: 500 JSONResponse with generic error detail.
-        :rtype: JSONResponse
+        :return: 500 ORJSONResponse with generic error detail.
+        :rtype: ORJSONResponse
         """
         logger.error("Unhandled exception occurred", exc_info=exc)
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={"detail": "Internal server error"}
         )
@@ -2,20 +2,26 @@
 # Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
 
 import asyncio
-import json
+import functools
 import os
 import logging
-from typing import AsyncGenerator, Optional, Dict
+from collections import OrderedDict
+from typing import AsyncGenerator, Optional, Dict, List, Tuple
 
+import aiofiles
 import fastapi
+import orjson
+from aiofiles.threadpool.binary import AsyncBufferedReader
 from fastapi import Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, PlainTextResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 
 from azure.ai.projects.aio import AIProjectClient
+from azure.core.exceptions import ResourceNotFoundError
 from azure.ai.projects.models import (
     Agent,
     MessageDeltaChunk,
+    OpenAIFile,
     ThreadMessage,
     ThreadRun,
     AsyncAgentEventHandler,
@@ -27,8 +33,24 @@ logging.getLogger("azure.core.pipeline.policies.http_logging_policy").setLevel(l
 directory = os.path.join(os.path.dirname(__file__), "templates")
 templates = Jinja2Templates(directory=directory)
 
+# index.html has no request-dependent content, so it is rendered once at import.
+_INDEX_HTML = templates.get_template("index.html").render().encode("utf-8")
+
 router = fastapi.APIRouter()
 
+# Window (in seconds) over which consecutive message deltas are coalesced into one SSE frame.
+DELTA_FLUSH_INTERVAL = 0.005
+
+# Lifetime (in seconds) of the thread_id/agent_id cookies, renewed on every chat.
+COOKIE_MAX_AGE = 30 * 24 * 60 * 60
+
+# Bounded LRU of small document contents, keyed on (path, mtime).
+# Documents larger than FILE_CACHE_MAX_BYTES are streamed in FILE_CHUNK_SIZE chunks instead.
+FILE_CACHE_MAX_ENTRIES = 32
+FILE_CACHE_MAX_BYTES = 256 * 1024
+FILE_CHUNK_SIZE = 64 * 1024
+_file_contents: "OrderedDict[Tuple[str, int], str]" = OrderedDict()
+
 
 def get_ai_client(request: Request) -> AIProjectClient:
     """
@@ -54,67 +76,257 @@ def get_agent(request: Request) -> Agent:
     return request.app.state.agent
 
 
-def serialize_sse_event(data: Dict) -> str:
+def get_file_names(request: Request) -> "FileNameCache":
+    """
+    Retrieve the shared FileNameCache from the FastAPI app state.
+
+    :param request: The incoming HTTP request.
+    :type request: Request
+    :return: The FileNameCache from the app state.
+    :rtype: FileNameCache
+    """
+    return request.app.state.file_names
+
+
+def get_admission(request: Request) -> "AdmissionController":
+    """
+    Retrieve the AdmissionController from the FastAPI app state.
+
+    :param request: The incoming HTTP request.
+    :type request: Request
+    :return: The AdmissionController from the app state.
+    :rtype: AdmissionController
+    """
+    return request.app.state.admission
+
+
+def error_response(status_code: int, detail: str) -> ORJSONResponse:
+    """
+    Build an error response shaped like FastAPI's HTTPException output, without
+    going through exception handling.
+
+    :param status_code: The HTTP status code.
+    :type status_code: int
+    :param detail: The error detail message.
+    :type detail: str
+    :return: A JSON response of the form {"detail": ...}.
+    :rtype: ORJSONResponse
     """
-    Convert a dictionary to a Server-Sent Event (SSE) string.
+    return ORJSONResponse(content={"detail": detail}, status_code=status_code)
+
+
+def serialize_sse_event(data: Dict) -> bytes:
+    """
+    Convert a dictionary to a Server-Sent Event (SSE) frame.
 
     :param data: The data to be formatted into SSE.
     :type data: Dict
-    :return: An SSE-formatted string.
-    :rtype: str
+    :return: An SSE-formatted, UTF-8 encoded frame.
+    :rtype: bytes
     """
-    return f"data: {json.dumps(data)}\n\n"
+    return b"data: " + orjson.dumps(data) + b"\n\n"
+
 
+# Constant frame emitted by on_error/on_done, serialized once at import.
+_STREAM_END_SSE = serialize_sse_event({'type': "stream_end"})
 
-class MyEventHandler(AsyncAgentEventHandler[str]):
+# SSE comment sent as soon as a chat stream opens; clients ignore it.
+_CONNECTING_SSE = b": connecting\n\n"
+
+# Fixed parts of the message frame; only the content string is encoded per frame.
+_MESSAGE_SSE_PREFIX = b'data: {"content":'
+_MESSAGE_SSE_SUFFIX = b',"type":"message"}\n\n'
+
+
+@functools.lru_cache(maxsize=256)
+def _serialize_thread_run(status: str, thread_id: str) -> bytes:
     """
-    Custom event handler to receive streamed events from an AI agent.
-    Each overridden method returns an SSE-formatted string (or None to skip).
+    Serialize a non-failed thread run event, memoized on its (status, thread_id).
+
+    :param status: The run status.
+    :type status: str
+    :param thread_id: The ID of the thread the run belongs to.
+    :type thread_id: str
+    :return: An SSE-formatted, UTF-8 encoded frame.
+    :rtype: bytes
+    """
+    run_info = f"ThreadRun status: {status}, thread ID: {thread_id}"
+    return serialize_sse_event({'content': run_info, 'type': 'thread_run'})
+
+
+class AdmissionController:
+    """
+    Caps the number of concurrently active chat streams in this worker.
+    Callers beyond the limit wait until a slot is released.
+    """
+
+    def __init__(self, max_active: int) -> None:
+        """
+        Initialize the AdmissionController.
+
+        :param max_active: The maximum number of concurrently active streams; must be at least 1.
+        :type max_active: int
+        :raises ValueError: If max_active is less than 1.
+        """
+        if max_active < 1:
+            raise ValueError(f"max_active must be at least 1, got {max_active}")
+        self.max_active = max_active
+        self.active = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        """
+        Wait for a free slot and claim it.
+        """
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.active < self.max_active)
+            self.active += 1
+
+    async def release(self) -> None:
+        """
+        Release a previously acquired slot.
+        All waiters are woken and re-check the limit, so a waiter cancelled before
+        it runs cannot swallow the wakeup.
+        """
+        async with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+
+class FileNameCache:
+    """
+    App-wide cache resolving uploaded file IDs to file names.
+    Shared by all streams so lookups stay warm across requests; concurrent
+    lookups of the same file ID share a single request.
     """
 
     def __init__(self, ai_client: AIProjectClient) -> None:
         """
-        Initialize the MyEventHandler with an AIProjectClient.
+        Initialize the FileNameCache with an AIProjectClient.
 
         :param ai_client: The AIProjectClient used for fetching file details.
         :type ai_client: AIProjectClient
         """
-        super().__init__()
         self.ai_client = ai_client
+        self._file_cache: Dict[str, str] = {}
+        self._file_fetches: Dict[str, asyncio.Future[OpenAIFile]] = {}
+
+    def _on_fetch_done(self, file_id: str, fetch: asyncio.Future[OpenAIFile]) -> None:
+        """
+        Forget a finished fetch, so a failure is retried by the next lookup rather than
+        re-raised from a stale future, even if every waiter was cancelled.
+
+        :param file_id: The ID of the fetched file.
+        :type file_id: str
+        :param fetch: The finished fetch.
+        :type fetch: asyncio.Future[OpenAIFile]
+        """
+        self._file_fetches.pop(file_id, None)
+        if not fetch.cancelled():
+            # Retrieve any exception so asyncio does not warn when every waiter was cancelled.
+            fetch.exception()
+
+    async def get(self, file_id: str) -> str:
+        """
+        Resolve a file ID to its file name, caching results and sharing in-flight fetches.
 
-    async def on_message_delta(self, delta: MessageDeltaChunk) -> Optional[str]:
+        :param file_id: The ID of the uploaded file.
+        :type file_id: str
+        :return: The name of the file.
+        :rtype: str
+        """
+        file_name = self._file_cache.get(file_id)
+        if file_name is not None:
+            return file_name
+
+        fetch = self._file_fetches.get(file_id)
+        if fetch is None:
+            logger.info("Fetching file by ID for annotation %s", file_id)
+            fetch = asyncio.ensure_future(self.ai_client.agents.get_file(file_id))
+            fetch.add_done_callback(functools.partial(self._on_fetch_done, file_id))
+            self._file_fetches[file_id] = fetch
+        openai_file = await asyncio.shield(fetch)
+
+        self._file_cache[file_id] = openai_file.filename
+        return openai_file.filename
+
+
+class MyEventHandler(AsyncAgentEventHandler[bytes]):
+    """
+    Custom event handler to receive streamed events from an AI agent.
+    Each overridden method returns an SSE-formatted frame as bytes (or None to skip).
+    Message deltas are buffered and published through `queue` in coalesced frames.
+    """
+
+    def __init__(self, file_names: "FileNameCache") -> None:
+        """
+        Initialize the MyEventHandler with the shared file name cache.
+
+        :param file_names: The app-wide cache used for resolving file details.
+        :type file_names: FileNameCache
+        """
+        super().__init__()
+        self.file_names = file_names
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._delta_buf: List[str] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    def flush(self) -> None:
+        """
+        Publish any buffered message deltas to the queue as a single SSE frame.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._delta_buf:
+            content = "".join(self._delta_buf)
+            self._delta_buf.clear()
+            self.queue.put_nowait(_MESSAGE_SSE_PREFIX + orjson.dumps(content) + _MESSAGE_SSE_SUFFIX)
+
+    async def on_message_delta(self, delta: MessageDeltaChunk) -> Optional[bytes]:
         """
         Called as partial message content is generated by the agent.
 
         :param delta: The chunk of text for this partial message.
         :type delta: MessageDeltaChunk
-        :return: SSE-formatted data or None to skip publishing.
-        :rtype: Optional[str]
+        :return: None; the delta is buffered and published by `flush`.
+        :rtype: Optional[bytes]
         """
-        stream_data = {'content': delta.text, 'type': "message"}
-        return serialize_sse_event(stream_data)
+        self._delta_buf.append(delta.text)
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(DELTA_FLUSH_INTERVAL, self.flush)
+        return None
 
-    async def on_thread_message(self, message: ThreadMessage) -> Optional[str]:
+    async def on_thread_message(self, message: ThreadMessage) -> Optional[bytes]:
         """
         Called when a new message is posted to the thread.
 
         :param message: The thread message object from the agent.
         :type message: ThreadMessage
         :return: SSE-formatted data if the message is complete, otherwise None.
-        :rtype: Optional[str]
+        :rtype: Optional[bytes]
         """
+        self.flush()
         try:
-            logger.info(f"Received thread message, ID: {message.id}, status: {message.status}")
+            logger.info("Received thread message, ID: %s, status: %s", message.id, message.status)
             if message.status != "completed":
                 return None
 
-            annotations = []
-            for annotation in (a.as_dict() for a in message.file_citation_annotations):
-                file_id = annotation["file_citation"]["file_id"]
-                logger.info(f"Fetching file by ID for annotation {file_id}")
-                openai_file = await self.ai_client.agents.get_file(file_id)
-                annotation["file_name"] = openai_file.filename
-                annotations.append(annotation)
+            annotations = [a.as_dict() for a in message.file_citation_annotations]
+            file_names = await asyncio.gather(
+                *(self.file_names.get(annotation["file_citation"]["file_id"]) for annotation in annotations),
+                return_exceptions=True
+            )
+            for annotation, file_name in zip(annotations, file_names):
+                if isinstance(file_name, BaseException):
+                    # The UI falls back to the annotation text when no file name is present.
+                    logger.warning(
+                        "Failed to fetch file %s for annotation",
+                        annotation["file_citation"]["file_id"],
+                        exc_info=file_name
+                    )
+                    continue
+                annotation["file_name"] = file_name
 
             stream_data = {
                 'content': message.text_messages[0].text.value,
@@ -126,60 +338,67 @@ class MyEventHandler(AsyncAgentEventHandler[str]):
             logger.error("Error in on_thread_message handler", exc_info=True)
             return None
 
-    async def on_thread_run(self, run: ThreadRun) -> Optional[str]:
+    async def on_thread_run(self, run: ThreadRun) -> Optional[bytes]:
         """
         Called for thread run events, such as agent actions or steps.
 
         :param run: The ThreadRun details from the agent.
         :type run: ThreadRun
         :return: SSE-formatted run result, or None to skip.
-        :rtype: Optional[str]
+        :rtype: Optional[bytes]
         """
         logger.info("Received on_thread_run event")
-        run_info = f"ThreadRun status: {run.status}, thread ID: {run.thread_id}"
+        self.flush()
         if run.status == "failed":
-            run_info += f", error: {run.last_error}"
-        return serialize_sse_event({'content': run_info, 'type': 'thread_run'})
+            run_info = f"ThreadRun status: {run.status}, thread ID: {run.thread_id}, error: {run.last_error}"
+            return serialize_sse_event({'content': run_info, 'type': 'thread_run'})
+        return _serialize_thread_run(run.status, run.thread_id)
 
-    async def on_error(self, data: str) -> Optional[str]:
+    async def on_error(self, data: str) -> Optional[bytes]:
         """
         Called if an error occurs during the streaming process.
 
         :param data: The error message or context.
         :type data: str
         :return: SSE-formatted data or None.
-        :rtype: Optional[str]
+        :rtype: Optional[bytes]
         """
-        logger.error(f"on_error event: {data}")
-        return serialize_sse_event({'type': "stream_end"})
+        logger.error("on_error event: %s", data)
+        self.flush()
+        return _STREAM_END_SSE
 
-    async def on_done(self) -> Optional[str]:
+    async def on_done(self) -> Optional[bytes]:
         """
         Called after all events have been processed.
 
         :return: SSE-formatted final indicator or None.
-        :rtype: Optional[str]
+        :rtype: Optional[bytes]
         """
         logger.info("on_done event received")
-        return serialize_sse_event({'type': "stream_end"})
+        self.flush()
+        return _STREAM_END_SSE
 
 
 @router.get("/", response_class=HTMLResponse)
-async def index(request: Request) -> HTMLResponse:
+async def index() -> HTMLResponse:
     """
-    Render the main index page.
+    Serve the main index page.
 
-    :param request: The incoming HTTP request.
-    :type request: Request
-    :return: The rendered `index.html` page.
+    :return: The pre-rendered `index.html` page.
     :rtype: HTMLResponse
     """
-    return templates.TemplateResponse("index.html", {"request": request})
+    return HTMLResponse(_INDEX_HTML)
 
 
-async def get_result(thread_id: str, agent_id: str, ai_client: AIProjectClient) -> AsyncGenerator[str, None]:
+async def _pump_events(
+    thread_id: str,
+    agent_id: str,
+    ai_client: AIProjectClient,
+    event_handler: MyEventHandler,
+) -> None:
     """
-    Create a generator that yields SSE events for an agent's thread.
+    Drive the agent stream and publish each SSE event onto the handler's queue.
+    A `None` sentinel is always published last.
 
     :param thread_id: The unique ID of the conversation thread.
     :type thread_id: str
@@ -187,27 +406,124 @@ async def get_result(thread_id: str, agent_id: str, ai_client: AIProjectClient)
     :type agent_id: str
     :param ai_client: The AIProjectClient instance to fetch stream events.
     :type ai_client: AIProjectClient
-    :yield: SSE-formatted string events.
-    :rtype: AsyncGenerator[str, None]
+    :param event_handler: The handler receiving the stream events.
+    :type event_handler: MyEventHandler
     """
-    logger.info(f"get_result invoked for thread_id={thread_id}, agent_id={agent_id}")
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
     try:
         async with await ai_client.agents.create_stream(
             thread_id=thread_id,
             assistant_id=agent_id,
-            event_handler=MyEventHandler(ai_client)
+            event_handler=event_handler
         ) as stream:
             logger.info("Successfully created stream; processing events")
             async for event in stream:
-                _, _, event_return_val = event
+                # Events are (event_type, event_data, handler_return_value) tuples.
+                event_return_val = event[2]
                 if event_return_val:
-                    logger.debug(f"Yielding SSE event: {event_return_val.strip()}")
-                    yield event_return_val
-                else:
+                    event_handler.queue.put_nowait(event_return_val)
+                elif debug_enabled:
                     logger.debug("Received event but nothing to yield")
     except Exception as e:
-        logger.exception(f"Exception in get_result: {e}")
-        yield serialize_sse_event({'type': "error", 'message': str(e)})
+        logger.exception("Exception in _pump_events: %s", e)
+        event_handler.flush()
+        event_handler.queue.put_nowait(serialize_sse_event({'type': "error", 'message': str(e)}))
+        event_handler.queue.put_nowait(_STREAM_END_SSE)
+    finally:
+        event_handler.flush()
+        event_handler.queue.put_nowait(None)
+
+
+async def get_result(
+    thread_id: str,
+    agent_id: str,
+    ai_client: AIProjectClient,
+    file_names: FileNameCache,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Create a generator that yields SSE events for an agent's thread.
+
+    :param thread_id: The unique ID of the conversation thread.
+    :type thread_id: str
+    :param agent_id: The associated agent ID.
+    :type agent_id: str
+    :param ai_client: The AIProjectClient instance to fetch stream events.
+    :type ai_client: AIProjectClient
+    :param file_names: The shared cache used to resolve citation file names.
+    :type file_names: FileNameCache
+    :yield: SSE-formatted events as bytes.
+    :rtype: AsyncGenerator[bytes, None]
+    """
+    logger.info("get_result invoked for thread_id=%s, agent_id=%s", thread_id, agent_id)
+    event_handler = MyEventHandler(file_names)
+    pump = asyncio.create_task(_pump_events(thread_id, agent_id, ai_client, event_handler))
+    # Checked once per stream so the per-event debug formatting is skipped entirely when disabled.
+    debug_enabled = logger.isEnabledFor(logging.DEBUG)
+    try:
+        while (event_return_val := await event_handler.queue.get()) is not None:
+            if debug_enabled:
+                logger.debug("Yielding SSE event: %s", event_return_val.strip())
+            yield event_return_val
+    finally:
+        pump.cancel()
+
+
+async def chat_stream(
+    thread_id: str,
+    agent_id: str,
+    user_message: str,
+    ai_client: AIProjectClient,
+    file_names: FileNameCache,
+    admission: AdmissionController,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Create a generator that opens the SSE stream immediately, then posts the user
+    message and yields the agent's events, so the client is not kept waiting on
+    backend round-trips before the first byte.
+
+    :param thread_id: The unique ID of the conversation thread.
+    :type thread_id: str
+    :param agent_id: The associated agent ID.
+    :type agent_id: str
+    :param user_message: The user's message to post to the thread.
+    :type user_message: str
+    :param ai_client: The AIProjectClient instance used for the thread.
+    :type ai_client: AIProjectClient
+    :param file_names: The shared cache used to resolve citation file names.
+    :type file_names: FileNameCache
+    :param admission: The controller bounding concurrent streams, held from before posting until the end.
+    :type admission: AdmissionController
+    :yield: SSE-formatted events as bytes.
+    :rtype: AsyncGenerator[bytes, None]
+    """
+    yield _CONNECTING_SSE
+
+    # Wait for a slot before posting, so a client that gives up while queued
+    # leaves no unanswered user message on the thread.
+    await admission.acquire()
+    try:
+        try:
+            message = await ai_client.agents.create_message(
+                thread_id=thread_id,
+                role="user",
+                content=user_message
+            )
+            logger.info("Created user message, ID: %s", message.id)
+        except Exception as e:
+            logger.error("Error creating user message: %s", e, exc_info=True)
+            yield serialize_sse_event({'type': "error", 'message': f"Message creation error: {e}"})
+            yield _STREAM_END_SSE
+            return
+
+        logger.info("Starting SSE stream for thread ID %s", thread_id)
+        events = get_result(thread_id, agent_id, ai_client, file_names)
+        try:
+            async for event in events:
+                yield event
+        finally:
+            await events.aclose()
+    finally:
+        await admission.release()
 
 
 @router.post("/chat")
@@ -215,10 +531,12 @@ async def chat(
     request: Request,
     ai_client: AIProjectClient = Depends(get_ai_client),
     agent: Agent = Depends(get_agent),
-) -> StreamingResponse:
+    file_names: FileNameCache = Depends(get_file_names),
+    admission: AdmissionController = Depends(get_admission),
+) -> fastapi.Response:
     """
-    Handle user chats by creating (or reusing) a thread, sending a user message,
-    and returning a streaming SSE response.
+    Handle user chats by creating (or reusing) a thread and returning a streaming
+    SSE response that sends the user message and relays the agent's events.
 
     :param request: The incoming HTTP request with JSON body {"message": "..."}.
     :type request: Request
@@ -226,58 +544,87 @@ async def chat(
     :type ai_client: AIProjectClient
     :param agent: Dependency-injected Agent from app state.
     :type agent: Agent
-    :return: A streaming SSE response of the conversation's events.
-    :rtype: StreamingResponse
+    :param file_names: Dependency-injected FileNameCache from app state.
+    :type file_names: FileNameCache
+    :param admission: Dependency-injected AdmissionController from app state.
+    :type admission: AdmissionController
+    :return: A streaming SSE response of the conversation's events, or a JSON error.
+    :rtype: fastapi.Response
     """
     thread_id = request.cookies.get('thread_id')
     agent_id = request.cookies.get('agent_id')
 
+    try:
+        user_data = await request.json()
+        user_message = user_data.get('message', '')
+    except Exception as e:
+        logger.error("Invalid JSON in request: %s", e, exc_info=True)
+        return error_response(400, f"Invalid JSON: {e}")
+
+    # The thread is resolved before the headers go out, since its ID goes into the cookies.
+    # A reused thread that no longer exists is replaced with a new one.
+    thread = None
     try:
         if thread_id and agent_id == agent.id:
-            logger.info(f"Retrieving existing thread with ID {thread_id}")
-            thread = await ai_client.agents.get_thread(thread_id)
-        else:
+            try:
+                logger.info("Retrieving existing thread with ID %s", thread_id)
+                thread = await ai_client.agents.get_thread(thread_id)
+            except ResourceNotFoundError:
+                logger.warning("Thread %s no longer exists; creating a new one", thread_id)
+        if thread is None:
             logger.info("Creating new thread")
             thread = await ai_client.agents.create_thread()
     except Exception as e:
-        logger.error(f"Error handling thread creation or retrieval: {e}", exc_info=True)
+        logger.error("Error handling thread creation or retrieval: %s", e, exc_info=True)
         raise HTTPException(status_code=400, detail=f"Thread error: {e}")
 
     thread_id = thread.id
     agent_id = agent.id
 
-    try:
-        user_data = await request.json()
-        user_message = user_data.get('message', '')
-    except Exception as e:
-        logger.error(f"Invalid JSON in request: {e}", exc_info=True)
-        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
-
-    try:
-        message = await ai_client.agents.create_message(
-            thread_id=thread_id,
-            role="user",
-            content=user_message
-        )
-        logger.info(f"Created user message, ID: {message.id}")
-    except Exception as e:
-        logger.error(f"Error creating user message: {e}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Message creation error: {e}")
-
+    # No hop-by-hop headers (e.g. Connection), which are invalid under HTTP/2.
     headers = {
         "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
-        "Content-Type": "text/event-stream",
     }
-    logger.info(f"Starting SSE stream for thread ID {thread_id}")
-    response = StreamingResponse(get_result(thread_id, agent_id, ai_client), headers=headers)
-
-    # Persist the thread and agent IDs via cookies
-    response.set_cookie("thread_id", thread_id)
-    response.set_cookie("agent_id", agent_id)
+    response = StreamingResponse(
+        chat_stream(thread_id, agent_id, user_message, ai_client, file_names, admission),
+        headers=headers,
+        media_type="text/event-stream"
+    )
+
+    # Persist the thread and agent IDs via cookies, re-sent on every chat so their lifetime
+    # is renewed while the conversation is active
+    response.set_cookie("thread_id", thread_id, max_age=COOKIE_MAX_AGE, samesite="lax")
+    response.set_cookie("agent_id", agent_id, max_age=COOKIE_MAX_AGE, samesite="lax")
     return response
 
 
+@functools.lru_cache(maxsize=1)
+def _parse_uploaded_file_map(files_env: str) -> Dict[str, Dict[str, str]]:
+    """
+    Parse the UPLOADED_FILE_MAP JSON, memoized on the raw environment value.
+
+    :param files_env: The raw UPLOADED_FILE_MAP value.
+    :type files_env: str
+    :return: Mapping of file name to its uploaded file info, or an empty dict if invalid.
+    :rtype: Dict[str, Dict[str, str]]
+    """
+    try:
+        return orjson.loads(files_env)
+    except orjson.JSONDecodeError:
+        logger.warning("Failed to parse UPLOADED_FILE_MAP from environment variable.", exc_info=True)
+        return {}
+
+
+def get_uploaded_files() -> Dict[str, Dict[str, str]]:
+    """
+    Return the uploaded file map, re-parsing it only when UPLOADED_FILE_MAP changes.
+
+    :return: Mapping of file name to its uploaded file info.
+    :rtype: Dict[str, Dict[str, str]]
+    """
+    return _parse_uploaded_file_map(os.environ.get("UPLOADED_FILE_MAP", "{}"))
+
+
 @router.get("/fetch-document")
 async def fetch_document(request: Request) -> fastapi.Response:
     """
@@ -290,29 +637,56 @@ async def fetch_document(request: Request) -> fastapi.Response:
     """
     file_name = request.query_params.get('file_name')
     if not file_name:
-        raise HTTPException(status_code=400, detail="file_name is required")
-
-    files_env = os.environ.get("UPLOADED_FILE_MAP", "{}")
-    try:
-        files = json.loads(files_env)
-    except json.JSONDecodeError:
-        files = {}
-        logger.warning("Failed to parse UPLOADED_FILE_MAP from environment variable.", exc_info=True)
+        return error_response(400, "file_name is required")
 
-    logger.info(f"File requested: {file_name}. Available keys: {list(files.keys())}")
+    files = get_uploaded_files()
+    logger.info("File requested: %s. Available keys: %s", file_name, list(files))
     if file_name not in files:
-        raise HTTPException(status_code=404, detail="File not found")
+        return error_response(404, "File not found")
 
     try:
         file_path = files[file_name]["path"]
-        data = await asyncio.to_thread(read_file, file_path)
+        stat = os.stat(file_path)
+        if stat.st_size > FILE_CACHE_MAX_BYTES:
+            # Open before responding, so open errors still produce the JSON error below.
+            file = await aiofiles.open(file_path, 'rb')
+            return StreamingResponse(iter_file(file), media_type="text/plain; charset=utf-8")
+        data = await read_file(file_path, stat)
         return PlainTextResponse(data)
     except Exception as e:
-        logger.error(f"Error fetching document '{file_name}': {e}", exc_info=True)
-        return JSONResponse(content={"error": str(e)}, status_code=500)
+        logger.error("Error fetching document '%s': %s", file_name, e, exc_info=True)
+        return ORJSONResponse(content={"error": str(e)}, status_code=500)
+
+
+async def read_file(path: str, stat: os.stat_result) -> str:
+    """
+    Asynchronously read the file content from a given path.
+    Small files are served from an in-process cache until their mtime changes.
+
+    :param path: The file system path to read from.
+    :type path: str
+    :param stat: The result of `os.stat` for the path, used for the cache key and size.
+    :type stat: os.stat_result
+    :return: The file contents.
+    :rtype: str
+    """
+    key = (path, stat.st_mtime_ns)
+    data = _file_contents.get(key)
+    if data is not None:
+        _file_contents.move_to_end(key)
+        return data
+
+    # A single executor hop for open, read and close on a cache miss.
+    data = await asyncio.to_thread(read_file_sync, path)
 
+    if stat.st_size <= FILE_CACHE_MAX_BYTES:
+        _file_contents[key] = data
+        if len(_file_contents) > FILE_CACHE_MAX_ENTRIES:
+            _file_contents.popitem(last=False)
+    return data
 
-def read_file(path: str) -> str:
+
+def read_file_sync(path: str) -> str:
     """
     Synchronously read the file content from a given path.
 
@@ -323,3 +697,23 @@ def read_file(path: str) -> str:
     """
     with open(path, 'r', encoding='utf-8') as file:
         return file.read()
+
+
+async def iter_file(file: AsyncBufferedReader, chunk_size: int = FILE_CHUNK_SIZE) -> AsyncGenerator[bytes, None]:
+    """
+    Asynchronously yield the raw content of an open file in chunks, closing it afterwards.
+    Unlike `read_file`, the bytes are passed through without UTF-8 validation, and read
+    errors can only truncate the body since the response headers have already been sent.
+
+    :param file: The file opened in binary mode.
+    :type file: AsyncBufferedReader
+    :param chunk_size: The maximum number of bytes per chunk.
+    :type chunk_size: int
+    :yield: Consecutive chunks of the file.
+    :rtype: AsyncGenerator[bytes, None]
+    """
+    try:
+        while chunk := await file.read(chunk_size):
+            yield chunk
+    finally:
+        await file.close()
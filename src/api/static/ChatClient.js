@@ -113,6 +113,9 @@ class ChatClient {
                             messageDiv = null;
                             accumulatedContent = '';
                             break;
+                        } else if (data.type === "error") {
+                            // Server-side failure after the stream opened; a stream_end marker follows
+                            console.error("[ChatClient] Error event received:", data.message);
                         } else if (data.type === "thread_run") {
                             // Log the run status info
                             console.log("[ChatClient] Run status info:", data.content);
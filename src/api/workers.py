@@ -0,0 +1,14 @@
+# Copyright (c) Microsoft. All rights reserved.
+# Licensed under the MIT license. See LICENSE.md file in the project root for full license information.
+
+from uvicorn.workers import UvicornWorker
+
+
+class UvloopWorker(UvicornWorker):
+    """
+    Uvicorn worker for Gunicorn that always runs on the uvloop event loop.
+    Unlike the default "auto" loop, this fails at startup if uvloop is missing
+    instead of silently falling back to the stdlib asyncio loop.
+    """
+
+    CONFIG_KWARGS = {**UvicornWorker.CONFIG_KWARGS, "loop": "uvloop"}
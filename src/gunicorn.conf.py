@@ -172,5 +172,5 @@ if not os.getenv("RUNNING_IN_PRODUCTION"):
 preload_app = True
 num_cpus = multiprocessing.cpu_count()
 workers = (num_cpus * 2) + 1
-worker_class = "uvicorn.workers.UvicornWorker"
+worker_class = "api.workers.UvloopWorker"
 timeout = 120